@@ -1,5 +1,6 @@
 """The nes-py NES emulator for Python 3."""
 from nes_py.nes_env import NESEnv
+from nes_py.nes_vector_env import NESVectorEnv
 
 # explicitly define the outward facing API of this package
-__all__ = [NESEnv.__name__]
\ No newline at end of file
+__all__ = [NESEnv.__name__, NESVectorEnv.__name__]
\ No newline at end of file
@@ -1,4 +1,6 @@
 """A simple class for viewing images using pyglet."""
+import ctypes
+import bisect
 import threading
 from typing import Dict
 from typing import List
@@ -10,6 +12,31 @@ from dataclasses import dataclass
 import numpy as np
 
 
+# the vertex shader that stretches the frame quad over the whole window.
+# frames are stored top-down, so the v texture coordinate is flipped
+_VERTEX_SHADER = """#version 330 core
+layout(location = 0) in vec2 position;
+layout(location = 1) in vec2 tex_coords;
+out vec2 uv;
+
+void main() {
+    gl_Position = vec4(position, 0.0, 1.0);
+    uv = vec2(tex_coords.x, 1.0 - tex_coords.y);
+}
+"""
+
+
+# the fragment shader that samples the frame texture
+_FRAGMENT_SHADER = """#version 330 core
+in vec2 uv;
+out vec4 color;
+uniform sampler2D frame;
+
+void main() {
+    color = texture(frame, uv);
+}
+"""
+
 
 @dataclass(init=False)
 class ImageViewer:
@@ -24,9 +51,19 @@ class ImageViewer:
         width (int): The width of the window in pixels.
         monitor_keyboard (bool): Whether to monitor keyboard events.
         relevant_keys (Optional[List[int]]): List of key codes to monitor. If None, all keys are monitored.
-        _pressed_keys (List[int]): Internal list of currently pressed keys.
+        _pressed_keys (List[int]): Internal sorted list of currently pressed keys.
+        _pressed_keys_tuple (Optional[Tuple[int, ...]]): Internal cache of the pressed keys.
         _is_escape_pressed (bool): Internal flag for escape key state.
         _window (Optional[BaseWindow]): Internal pyglet window instance.
+        _texture (Optional[GLuint]): Internal persistent texture for frames.
+        _pbos (Optional[Array]): Internal pixel buffer objects for frame uploads.
+        _pbo_index (int): Internal index of the pixel buffer to fill next.
+        _program (Optional[ShaderProgram]): Internal program that draws the frame quad.
+        _vao (Optional[GLuint]): Internal vertex array describing the frame quad.
+        _vbo (Optional[GLuint]): Internal vertex buffer holding the frame quad.
+        _frames_until_dispatch (int): Internal count of frames until events are dispatched.
+        _validated (bool): Internal flag for whether a frame has been validated.
+        _frame_buffer (Optional[np.ndarray]): Internal staging buffer for CPU uploads.
     """
 
     caption: str
@@ -35,13 +72,37 @@ class ImageViewer:
     monitor_keyboard: bool
     relevant_keys: Optional[List[int]]
     _pressed_keys: List[int]
+    _pressed_keys_tuple: Optional[Tuple[int, ...]]
     _is_escape_pressed: bool    
     _window: Optional
+    _texture: Optional
+    _pbos: Optional
+    _pbo_index: int
+    _program: Optional
+    _vao: Optional
+    _vbo: Optional
+    _frames_until_dispatch: int
+    _validated: bool
+    _frame_buffer: Optional[np.ndarray]
     _pyglet: Optional
 
     # Map pyglet key codes to their native equivalents
     KEY_MAP: Dict[int, int]
 
+    # The rate to dispatch events at from the pyglet clock when monitoring keys
+    DISPATCH_RATE: ClassVar[float] = 500.0
+
+    # The number of frames to show between event dispatches otherwise
+    DISPATCH_INTERVAL: ClassVar[int] = 4
+
+    # Interleaved (x, y, u, v) vertices of a triangle strip covering the window
+    QUAD: ClassVar[np.ndarray] = np.array([
+        -1.0, -1.0, 0.0, 0.0,
+         1.0, -1.0, 1.0, 0.0,
+        -1.0,  1.0, 0.0, 1.0,
+         1.0,  1.0, 1.0, 1.0,
+    ], dtype=np.float32)
+
     def __init__(
         self, 
         caption: str, 
@@ -74,10 +135,20 @@ class ImageViewer:
         }        
         
         self._window = None
+        self._texture = None
+        self._pbos = None
+        self._pbo_index = 0
+        self._program = None
+        self._vao = None
+        self._vbo = None
+        self._frames_until_dispatch = 0
+        self._validated = False
+        self._frame_buffer = None
         self.height = height
         self.width = width
         self.caption = caption
         self._pressed_keys = list()
+        self._pressed_keys_tuple = ()
         self._is_escape_pressed = False
         self.relevant_keys = relevant_keys
         self.monitor_keyboard = monitor_keyboard        
@@ -107,7 +178,9 @@ class ImageViewer:
         Returns:
             Tuple[int, ...]: A sorted tuple of key codes currently being pressed.
         """
-        return tuple(sorted(self._pressed_keys))
+        if self._pressed_keys_tuple is None:
+            self._pressed_keys_tuple = tuple(self._pressed_keys)
+        return self._pressed_keys_tuple
 
     def _handle_key_event(self, symbol: int, is_press: bool) -> None:
         """Handle keyboard press/release events.
@@ -118,7 +191,7 @@ class ImageViewer:
         """
         symbol = self.KEY_MAP.get(symbol, symbol)
 
-        if symbol == key.ESCAPE:
+        if symbol == self._pyglet.window.key.ESCAPE:
             self._is_escape_pressed = is_press
             return
         
@@ -126,9 +199,11 @@ class ImageViewer:
             return
         
         if is_press:
-            self._pressed_keys.append(symbol)
+            bisect.insort(self._pressed_keys, symbol)
         else:
             self._pressed_keys.remove(symbol)
+        # invalidate the cached tuple of pressed keys
+        self._pressed_keys_tuple = None
 
     def on_key_press(self, symbol: int, modifiers: int) -> None:
         """Handle key press events from pyglet.
@@ -148,11 +223,20 @@ class ImageViewer:
         """
         self._handle_key_event(symbol, False)
 
+    def _dispatch_events(self, dt: float) -> None:
+        """Dispatch pending window events from the pyglet clock.
+
+        Args:
+            dt: The time in seconds since the last scheduled dispatch.
+        """
+        self._window.dispatch_events()
+
     def open(self) -> None:
         """Create and open the pyglet window.
 
         Creates a new window with the configured caption, dimensions and vsync settings.
-        If keyboard monitoring is enabled, sets up the key event handlers.
+        If keyboard monitoring is enabled, sets up the key event handlers and
+        schedules event dispatch on the pyglet clock, which the caller must tick.
         """
         # create a window for this image viewer instance
         self._window = self._pyglet.window.Window(
@@ -167,56 +251,181 @@ class ImageViewer:
         if self.monitor_keyboard:
             self._window.event(self.on_key_press)
             self._window.event(self.on_key_release)
+            self._pyglet.clock.schedule_interval(
+                self._dispatch_events, 1 / self.DISPATCH_RATE
+            )
+
+        gl = self._pyglet.gl
+        frame_size = self.height * self.width * 3
+
+        # frame rows are tightly packed RGB, so don't pad them to 4 bytes
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+
+        # allocate the storage for the persistent frame texture once
+        self._texture = gl.GLuint()
+        gl.glGenTextures(1, ctypes.byref(self._texture))
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._texture)
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D, 0, gl.GL_RGB8,
+            self.width, self.height, 0,
+            gl.GL_RGB, gl.GL_UNSIGNED_BYTE, None
+        )
+        # the filters are texture state, so they only need to be set once
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+
+        # allocate a pair of pixel buffers to alternate frame uploads between
+        self._pbos = (gl.GLuint * 2)()
+        self._pbo_index = 0
+        gl.glGenBuffers(2, self._pbos)
+        for pbo in self._pbos:
+            gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, pbo)
+            gl.glBufferData(
+                gl.GL_PIXEL_UNPACK_BUFFER, frame_size, None, gl.GL_STREAM_DRAW
+            )
+        gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, 0)
+
+        # compile the program that samples the frame texture onto the quad
+        shader = self._pyglet.graphics.shader
+        self._program = shader.ShaderProgram(
+            shader.Shader(_VERTEX_SHADER, 'vertex'),
+            shader.Shader(_FRAGMENT_SHADER, 'fragment'),
+        )
+
+        # store the quad in a vertex buffer described by a vertex array
+        self._vao = gl.GLuint()
+        gl.glGenVertexArrays(1, ctypes.byref(self._vao))
+        gl.glBindVertexArray(self._vao)
+        self._vbo = gl.GLuint()
+        gl.glGenBuffers(1, ctypes.byref(self._vbo))
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+        gl.glBufferData(
+            gl.GL_ARRAY_BUFFER, self.QUAD.nbytes,
+            self.QUAD.ctypes.data, gl.GL_STATIC_DRAW
+        )
+        stride = 4 * self.QUAD.itemsize
+        gl.glEnableVertexAttribArray(0)
+        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, stride, 0)
+        gl.glEnableVertexAttribArray(1)
+        gl.glVertexAttribPointer(
+            1, 2, gl.GL_FLOAT, gl.GL_FALSE, stride, 2 * self.QUAD.itemsize
+        )
+        gl.glBindVertexArray(0)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
 
     def close(self) -> None:
         """Close the pyglet window if it's open."""
         if self.is_open:
+            if self.monitor_keyboard:
+                self._pyglet.clock.unschedule(self._dispatch_events)
+            gl = self._pyglet.gl
+            self._window.switch_to()
+            gl.glDeleteVertexArrays(1, ctypes.byref(self._vao))
+            gl.glDeleteBuffers(1, ctypes.byref(self._vbo))
+            gl.glDeleteBuffers(2, self._pbos)
+            gl.glDeleteTextures(1, ctypes.byref(self._texture))
+            self._vao = None
+            self._vbo = None
+            self._pbos = None
+            self._texture = None
+            self._program = None
             self._window.close()
             self._window = None
 
+    def _upload(self, frame: np.ndarray) -> None:
+        """Upload a frame to the persistent texture through a pixel buffer.
+
+        The frame is copied straight into the mapped pixel buffer, and the
+        texture is updated from the buffer while the other buffer is filled
+        on the next call. If the buffer can't be mapped, the frame is uploaded
+        from CPU memory instead, through a reused staging buffer if the frame
+        isn't C-contiguous.
+
+        Args:
+            frame: RGB image array of shape (height, width, 3).
+        """
+        gl = self._pyglet.gl
+        frame_size = self.height * self.width * 3
+
+        gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, self._pbos[self._pbo_index])
+        pointer = gl.glMapBufferRange(
+            gl.GL_PIXEL_UNPACK_BUFFER, 0, frame_size,
+            gl.GL_MAP_WRITE_BIT | gl.GL_MAP_UNSYNCHRONIZED_BIT
+        )
+        if pointer:
+            # copy (and gather strided views of) the frame into the buffer
+            buffer = (ctypes.c_uint8 * frame_size).from_address(pointer)
+            np.copyto(np.frombuffer(buffer, dtype=np.uint8).reshape(frame.shape), frame)
+            gl.glUnmapBuffer(gl.GL_PIXEL_UNPACK_BUFFER)
+            # the texture data is read from offset 0 of the bound buffer
+            data = 0
+        else:
+            gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, 0)
+            if not frame.flags['C_CONTIGUOUS']:
+                if self._frame_buffer is None:
+                    self._frame_buffer = np.empty_like(frame, order='C')
+                np.copyto(self._frame_buffer, frame)
+                frame = self._frame_buffer
+            data = frame.ctypes.data
+
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._texture)
+        gl.glTexSubImage2D(
+            gl.GL_TEXTURE_2D, 0, 0, 0, self.width, self.height,
+            gl.GL_RGB, gl.GL_UNSIGNED_BYTE, ctypes.c_void_p(data)
+        )
+        gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, 0)
+
+        # the GPU consumes this buffer while the other one is filled next
+        self._pbo_index ^= 1
+
     def show(self, frame: np.ndarray) -> None:
         """Display an RGB image array in the window.
 
-        Opens the window if it isn't already open, clears it, and displays the new frame
-        scaled to fit the window dimensions.
+        Opens the window if it isn't already open and displays the new frame scaled to
+        fit the window dimensions. The frame is opaque and covers the whole window, so
+        the window isn't cleared beforehand.
+
+        Frames come from a fixed size emulator screen, so only the first frame is
+        validated. The frame may be a strided view, e.g., of the emulator screen.
 
         Args:
-            frame: RGB image array of shape (height, width, 3).
+            frame: uint8 RGB image array of shape (height, width, 3).
 
         Raises:
-            ValueError: If frame doesn't have exactly 3 dimensions.
+            ValueError: If the first frame doesn't have shape (height, width, 3)
+                or isn't a uint8 array.
         """
-        if len(frame.shape) != 3:
-            raise ValueError('frame should have shape with only 3 dimensions')
-        
+        if not self._validated:
+            if len(frame.shape) != 3:
+                raise ValueError('frame should have shape with only 3 dimensions')
+            if frame.shape != (self.height, self.width, 3):
+                msg = 'frame should have shape {}'.format((self.height, self.width, 3))
+                raise ValueError(msg)
+            if frame.dtype != np.uint8:
+                raise ValueError('frame should have dtype uint8')
+            self._validated = True
+
         if not self.is_open:
             self.open()
         
-        self._window.clear()
         self._window.switch_to()
-        self._window.dispatch_events()
-
-        image = self._pyglet.image.ImageData(
-            frame.shape[1],
-            frame.shape[0],
-            'RGB',
-            frame.tobytes(),
-            pitch=frame.shape[1] * -3
-        )
-        
-        texture = image.get_texture()        
-        self._pyglet.gl.glTexParameteri(
-            self._pyglet.gl.GL_TEXTURE_2D, 
-            self._pyglet.gl.GL_TEXTURE_MAG_FILTER, 
-            self._pyglet.gl.GL_NEAREST
-        )
-        self._pyglet.gl.glTexParameteri(
-            self._pyglet.gl.GL_TEXTURE_2D, 
-            self._pyglet.gl.GL_TEXTURE_MIN_FILTER, 
-            self._pyglet.gl.GL_NEAREST
-        )
-        
-        image.blit(0, 0, width=self._window.width, height=self._window.height) 
+        # keyboard monitors dispatch events from the pyglet clock instead
+        if not self.monitor_keyboard:
+            self._frames_until_dispatch -= 1
+            if self._frames_until_dispatch <= 0:
+                self._window.dispatch_events()
+                self._frames_until_dispatch = self.DISPATCH_INTERVAL
+
+        self._upload(frame)
+
+        # draw the quad with the frame texture that is still bound
+        gl = self._pyglet.gl
+        gl.glUseProgram(self._program.id)
+        gl.glBindVertexArray(self._vao)
+        gl.glDrawArrays(gl.GL_TRIANGLE_STRIP, 0, 4)
+        gl.glBindVertexArray(0)
+        gl.glUseProgram(0)
         self._window.flip()
 
 
@@ -79,6 +79,21 @@ class Emulator {
     /// Perform a step on the emulator, i.e., a single frame.
     void step();
 
+    /// Perform a step on the emulator for each action in a sequence.
+    ///
+    /// @param actions the actions to press on the first controller
+    /// @param count the number of actions, i.e., frames, to run
+    ///
+    void step_many(const NES_Byte* actions, std::size_t count);
+
+    /// Perform a number of steps on the emulator holding the same actions.
+    ///
+    /// @param player_1 the action to press on the first controller
+    /// @param player_2 the action to press on the second controller
+    /// @param frames the number of frames to run
+    ///
+    void step_n(NES_Byte player_1, NES_Byte player_2, std::size_t frames);
+
     /// Perform a step on the PPU, i.e., a single frame.
     void ppu_step();
 
@@ -64,6 +64,20 @@ class MainBus {
     /// Initialize a new main bus.
     MainBus() : mapper(nullptr) { }
 
+    /// Copy the state of another bus, keeping the mapper and IO callbacks.
+    ///
+    /// The mapper and callbacks are bound to the emulator that owns the bus,
+    /// and a state restored from raw bytes may come from another emulator.
+    ///
+    /// @param other the bus to copy the RAM from
+    /// @return a reference to this bus
+    ///
+    MainBus& operator=(const MainBus& other) {
+        ram = other.ram;
+        extended_ram = other.extended_ram;
+        return *this;
+    }
+
     /// Return a 8-bit pointer to the RAM buffer's first address.
     ///
     /// @return a 8-bit pointer to the RAM buffer's first address
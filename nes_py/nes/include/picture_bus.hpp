@@ -10,6 +10,8 @@
 
 #include <vector>
 #include <cstdlib>
+#include <iterator>
+#include <algorithm>
 #include "common.hpp"
 #include "mapper.hpp"
 
@@ -31,6 +33,21 @@ class PictureBus {
     /// Initialize a new picture bus.
     PictureBus() : mapper(nullptr) { }
 
+    /// Copy the state of another bus, keeping the mapper of this bus.
+    ///
+    /// The mapper is bound to the emulator that owns the bus, and a state
+    /// restored from raw bytes may come from another emulator.
+    ///
+    /// @param other the bus to copy the VRAM, name tables, and palette from
+    /// @return a reference to this bus
+    ///
+    PictureBus& operator=(const PictureBus& other) {
+        ram = other.ram;
+        std::copy(std::begin(other.name_tables), std::end(other.name_tables), name_tables);
+        palette = other.palette;
+        return *this;
+    }
+
     /// Read a byte from an address on the VRAM.
     ///
     /// @param address the 16-bit address of the byte to read in the VRAM
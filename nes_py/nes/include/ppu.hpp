@@ -11,6 +11,8 @@
 #include "common.hpp"
 #include "picture_bus.hpp"
 #include <array>
+#include <utility>
+#include <functional>
 
 namespace NES {
 
@@ -27,11 +29,37 @@ const int FRAME_END_SCANLINE = 261;
 
 typedef NES_Pixel NESFrameBufferT[VISIBLE_SCANLINES][SCANLINE_VISIBLE_DOTS];
 
+/// A callback that stays bound to the emulator that set it.
+///
+/// Assigning the state of another PPU, e.g., one restored from the raw bytes
+/// of another emulator's snapshot, keeps this callback instead of copying it.
+class BoundCallback {
+ private:
+    /// the function to call
+    std::function<void(void)> callback;
+
+ public:
+    BoundCallback() = default;
+    BoundCallback(const BoundCallback&) = default;
+
+    /// Keep this callback when assigned from another.
+    BoundCallback& operator=(const BoundCallback&) { return *this; }
+
+    /// Set the function to call.
+    BoundCallback& operator=(std::function<void(void)> cb) {
+        callback = std::move(cb);
+        return *this;
+    }
+
+    /// Call the function.
+    inline void operator()() const { callback(); }
+};
+
 /// The Picture Processing Unit (PPU) for the NES
 class PPU {
  private:
     /// The callback to fire when entering vertical blanking mode
-    std::function<void(void)> vblank_callback;
+    BoundCallback vblank_callback;
     /// The OAM memory (sprites)
     static_vector<NES_Byte, 64 * 4> sprite_memory;
     /// OAM memory (sprites) for the next scanline
@@ -104,6 +104,23 @@ void Emulator::step() {
     }
 }
 
+void Emulator::step_many(const NES_Byte* actions, std::size_t count) {
+    // render a frame on the emulator for each action
+    for (std::size_t i = 0; i < count; i++) {
+        *get_controller(0) = actions[i];
+        step();
+    }
+}
+
+void Emulator::step_n(NES_Byte player_1, NES_Byte player_2, std::size_t frames) {
+    // the controllers only latch once per frame, so write them a single time
+    *get_controller(0) = player_1;
+    *get_controller(1) = player_2;
+    for (std::size_t i = 0; i < frames; i++) {
+        step();
+    }
+}
+
 void Emulator::ppu_step() {
     // render a single frame on the emulator
     for (int i = 0; i < CYCLES_PER_FRAME; i++) {
@@ -22,13 +22,39 @@ PYBIND11_MODULE(emulator, m) {
 
         .def_property_readonly_static("width", [](py::object) { return NES::Emulator::WIDTH; })
         .def_property_readonly_static("height", [](py::object) { return NES::Emulator::HEIGHT; })        
+        .def_property_readonly_static("state_size", [](py::object) { return sizeof(NES::Core); })
 
         .def("reset", &NES::Emulator::reset, "Reset the emulator")
         .def("step", &NES::Emulator::step, "Perform a step on the emulator")
-        
+
+        .def(
+            "step_many",
+            [](NES::Emulator& emu, const py::array_t<uint8_t, py::array::c_style | py::array::forcecast>& actions) {
+                const uint8_t* data = actions.data();
+                const auto count = static_cast<std::size_t>(actions.size());
+                // the frames only touch emulator memory, so let other threads run
+                py::gil_scoped_release release;
+                emu.step_many(data, count);
+            },
+            py::arg("actions"),
+            "Perform a step on the emulator for each action on the first controller"
+        )
+
+        .def(
+            "step_n",
+            &NES::Emulator::step_n,
+            py::arg("player_1"),
+            py::arg("player_2"),
+            py::arg("frames"),
+            // the frames only touch emulator memory, so let other threads run
+            py::call_guard<py::gil_scoped_release>(),
+            "Perform a number of steps on the emulator holding the same actions"
+        )
+
         .def(
             "screen_buffer", 
-            [](NES::Emulator& emu) -> py::array_t<uint8_t> {
+            [](py::object self) -> py::array_t<uint8_t> {
+                auto& emu = self.cast<NES::Emulator&>();
                 const int HEIGHT = NES::Emulator::HEIGHT;
                 const int WIDTH = NES::Emulator::WIDTH;
                 
@@ -38,7 +64,7 @@ PYBIND11_MODULE(emulator, m) {
                         {HEIGHT, WIDTH, 3},                    // shape (3 channels)
                         {WIDTH * 4, 4, -1},                   // negative stride to reverse BGR->RGB
                         reinterpret_cast<uint8_t*>(emu.get_screen_buffer()) + 2,  // start at B
-                        py::capsule(emu.get_screen_buffer(), [](void*) {})  // capsule with data pointer
+                        self                                  // the view keeps the emulator alive
                     );
                 #else
                     // On big-endian systems: xRGB -> RGB
@@ -46,22 +72,37 @@ PYBIND11_MODULE(emulator, m) {
                         {HEIGHT, WIDTH, 3},                    // shape (3 channels)
                         {WIDTH * 4, 4, 1},                    // normal stride
                         reinterpret_cast<uint8_t*>(emu.get_screen_buffer()) + 1,  // skip x
-                        py::capsule(emu.get_screen_buffer(), [](void*) {})  // capsule with data pointer
+                        self                                  // the view keeps the emulator alive
                     );
                 #endif
             }, 
             "Get the screen buffer as a HEIGHT x WIDTH x 3 numpy.ndarray in RGB format"
         )
 
+        .def(
+            "frame_buffer",
+            [](py::object self) -> py::array_t<uint32_t> {
+                auto& emu = self.cast<NES::Emulator&>();
+                // Create a view of the raw pixels in the native 32-bit format
+                return py::array_t<uint32_t>(
+                    {NES::Emulator::HEIGHT, NES::Emulator::WIDTH},  // shape
+                    reinterpret_cast<uint32_t*>(emu.get_screen_buffer()),  // pointer to data
+                    self                                    // the view keeps the emulator alive
+                );
+            },
+            "Get the raw 32-bit frame buffer as a HEIGHT x WIDTH numpy.ndarray"
+        )
+
         .def(
             "controller",
-            [](NES::Emulator& emu, int port) -> py::array_t<uint8_t> {
+            [](py::object self, int port) -> py::array_t<uint8_t> {
+                auto& emu = self.cast<NES::Emulator&>();
                 // Create a view of the controller buffer
                 return py::array_t<uint8_t>(
                     {1},                                    // shape (1 controller)
                     {1},                                    // stride (1 byte per controller)
                     reinterpret_cast<uint8_t*>(emu.get_controller(port)),  // pointer to data
-                    py::capsule(emu.get_controller(port), [](void*) {})    // capsule with data pointer
+                    self                                    // the view keeps the emulator alive
                 );
             },
             py::arg("port"),
@@ -70,13 +111,14 @@ PYBIND11_MODULE(emulator, m) {
 
         .def(
             "memory_buffer", 
-            [](NES::Emulator& emu) -> py::array_t<uint8_t> {
+            [](py::object self) -> py::array_t<uint8_t> {
+                auto& emu = self.cast<NES::Emulator&>();
                 // Create a view of the RAM buffer (0x800 bytes)
                 return py::array_t<uint8_t>(
                     {0x800},                               // shape (2048 bytes)
                     {1},                                   // stride (1 byte)
                     reinterpret_cast<uint8_t*>(emu.get_memory_buffer()),  // pointer to data
-                    py::capsule(emu.get_memory_buffer(), [](void*) {})    // capsule with data pointer
+                    self                                   // the view keeps the emulator alive
                 );
             }, 
             "Get the memory buffer as numpy.ndarray"
@@ -100,13 +142,28 @@ PYBIND11_MODULE(emulator, m) {
             "Dump the current state to bytes"
         )
 
+        .def(
+            "dump_state_into",
+            [](NES::Emulator& emu, py::array_t<uint8_t, py::array::c_style>& state) {
+                // the state must hold a core from dump_state, so it can be assigned to
+                if (static_cast<std::size_t>(state.size()) != sizeof(NES::Core))
+                    throw py::value_error("state must be a buffer from dump_state");
+                emu.snapshot(reinterpret_cast<NES::Core*>(state.mutable_data()));
+            },
+            py::arg("state").noconvert(),
+            "Dump the current state into a buffer returned by dump_state"
+        )
+
         .def(
             "load_state",
-            [](NES::Emulator& emu, const py::array_t<uint8_t>& state) {
+            [](NES::Emulator& emu, const py::array_t<uint8_t>& state, bool ppu_step) {
                 emu.restore(reinterpret_cast<const NES::Core*>(state.request().ptr));
-                emu.ppu_step();
+                // run a PPU frame to redraw the screen buffer from the state
+                if (ppu_step)
+                    emu.ppu_step();
             },
             py::arg("state"),
+            py::arg("ppu_step") = true,
             "Load state from bytes"
         )
     ;
@@ -1,29 +1,36 @@
 """A CTypes interface to the C++ NES environment."""
-import itertools
+import os
+import math
 from typing import Any
+from typing import Set
 from typing import Dict
-from typing import List
 from typing import Tuple
 from typing import Union
 from typing import ClassVar
 from typing import Optional
-from typing import NamedTuple
 from typing import SupportsFloat
-from dataclasses import dataclass
 
 import numpy as np
 import gymnasium as gym
 import lz4.block as lz4
 from gymnasium.spaces import Box
 from gymnasium.spaces import Discrete
+from gymnasium.utils import seeding
 
 from nes_py._rom import ROM
 from nes_py.emulator import NESEmulator
 from nes_py._image_viewer import ImageViewer
 
 
+# the ROM files that passed the compatibility check by path, size, and mtime
+_COMPATIBLE_ROMS: Set[Tuple[str, int, int]] = set()
+
 
 class NESGameCallbacks:
+    def _overrides(self, name: str) -> bool:
+        """Return True if the class overrides the callback with given name."""
+        return getattr(type(self), name) is not getattr(NESGameCallbacks, name)
+
     def _will_reset(self):
         """Handle any RAM hacking after a reset occurs."""
         pass
@@ -60,20 +67,54 @@ class NESGameCallbacks:
         """Return the info after a step occurs."""
         return {}
     
-@dataclass(init=False)
 class NESEmulatorWrapper(NESGameCallbacks):    
     _rom_path: str
-    _emulator: NESEmulator    
+    _emulator: NESEmulator
+    _screen_view: np.ndarray
+    _ram_view: np.ndarray
+    _controllers: Tuple[np.ndarray, np.ndarray]
+    _controller0: np.ndarray
+    _state_buffer: np.ndarray
+    _has_dump_state: bool
 
     height: int = NESEmulator.height
     width: int = NESEmulator.width
+    state_size: int = NESEmulator.state_size
 
     def __init__(self, rom_path: str):    
-        NESEmulatorWrapper.check_rom_compatibility(ROM.from_path(rom_path))
-        
+        NESEmulatorWrapper._check_rom_path(rom_path)
+
         self._rom_path = rom_path
         self._emulator = NESEmulator(rom_path)
-        
+        # the buffers are views into emulator memory, so create them once
+        self._screen_view = self._emulator.screen_buffer()
+        self._ram_view = self._emulator.memory_buffer()
+        self._controllers = tuple(self._emulator.controller(port) for port in range(2))
+        self._controller0 = self._controllers[0]
+        # the state buffer that compressed snapshots are dumped into, used
+        # only if a subclass doesn't override dump_state with its own format
+        self._state_buffer = self._emulator.dump_state()
+        self._has_dump_state = type(self).dump_state is not NESEmulatorWrapper.dump_state
+        assert self._screen_view.shape == (self.height, self.width, 3)
+
+    @staticmethod
+    def _check_rom_path(rom_path: str):
+        """Check the ROM at a path once for each version of the file."""
+        key = None
+        if isinstance(rom_path, str):
+            try:
+                stat = os.stat(rom_path)
+            except OSError:
+                pass
+            else:
+                key = (os.path.abspath(rom_path), stat.st_size, stat.st_mtime_ns)
+                if key in _COMPATIBLE_ROMS:
+                    return
+        # parse and validate the ROM, raising the error for a missing file
+        NESEmulatorWrapper.check_rom_compatibility(ROM.from_path(rom_path))
+        if key is not None:
+            _COMPATIBLE_ROMS.add(key)
+
     @staticmethod
     def check_rom_compatibility(rom: ROM):
         """Check that the ROM is compatible with the NES environment."""
@@ -102,23 +143,23 @@ class NESEmulatorWrapper(NESGameCallbacks):
 
     @property
     def _screen_buffer(self) -> np.ndarray:
-        return self._emulator.screen_buffer()
+        return self._screen_view
 
     @property
     def _memory_buffer(self) -> np.ndarray:
-        return self._emulator.memory_buffer()
+        return self._ram_view
     
     @property
-    def _controller_buffers(self) -> List[np.ndarray]:
-        return [self._emulator.controller(port) for port in range(2)]
+    def _controller_buffers(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._controllers
     
     @property
     def ram(self) -> np.ndarray:
-        return self._memory_buffer
+        return self._ram_view
     
     @property
-    def screen(self) -> bytes:
-        return self._screen_buffer
+    def screen(self) -> np.ndarray:
+        return self._screen_view
        
     def dump_state(self) -> np.ndarray:
         return self._emulator.dump_state()
@@ -128,6 +169,39 @@ class NESEmulatorWrapper(NESGameCallbacks):
         self._emulator.load_state(snapshot)
         self._did_restore()
 
+    def dump_state_compressed(self) -> bytes:
+        """
+        Return the current state of the emulator compressed with LZ4.
+
+        Returns:
+            the LZ4 block of the state, without the size header because the
+            size of a state is always `state_size`, unless a subclass
+            overrides `dump_state` with its own format
+
+        """
+        if self._has_dump_state:
+            return lz4.compress(self.dump_state(), mode='fast')
+        # reuse the state buffer instead of allocating a new state each time
+        self._emulator.dump_state_into(self._state_buffer)
+        return lz4.compress(self._state_buffer, mode='fast', store_size=False)
+
+    def load_state_compressed(self, snapshot: bytes):
+        """
+        Load a state of the emulator compressed with `dump_state_compressed`.
+
+        Args:
+            snapshot (bytes): the LZ4 block of the state to load
+
+        Returns:
+            None
+
+        """
+        if self._has_dump_state:
+            state = lz4.decompress(snapshot)
+        else:
+            state = lz4.decompress(snapshot, uncompressed_size=self.state_size)
+        self.load_state(np.frombuffer(state, dtype=np.uint8))
+
     def frame_advance(self, action: Union[int, Tuple[int, int]]) -> None:
         """
         Advance a frame in the emulator with an action.
@@ -139,37 +213,90 @@ class NESEmulatorWrapper(NESGameCallbacks):
             None
 
         """
-        # set the action on the controller
         if isinstance(action, (int, np.integer)):
-            self._controller_buffers[0][:] = action
+            self._advance_int(action)
         elif isinstance(action, tuple) and len(action) == 2:
-            self._controller_buffers[0][:] = action[0]
-            self._controller_buffers[1][:] = action[1]
+            self._advance_tuple(action)
         else:
             raise ValueError(f'Invalid action type or length: {type(action)}')
 
-        # perform a step on the emulator
-        self._emulator.step()        
+    def _advance_int(self, action: int) -> None:
+        """Advance a frame with a byte action for the first joy-pad."""
+        self._controller0[0] = action
+        self._emulator.step()
+
+    def _advance_tuple(self, action: Tuple[int, int]) -> None:
+        """Advance a frame with a pair of byte actions for both joy-pads."""
+        self._controller0[0] = action[0]
+        self._controllers[1][0] = action[1]
+        self._emulator.step()
+
+    def frame_advance_n(self, action: Union[int, Tuple[int, int]], n: int) -> None:
+        """
+        Advance a number of frames in the emulator holding the same action.
+
+        Args:
+            action (byte): the action to press on the joy-pad, or a pair of
+                actions for both joy-pads
+            n (int): the number of frames to advance
+
+        Returns:
+            None
+
+        """
+        if isinstance(action, (int, np.integer)):
+            # keep whatever the second joy-pad is already pressing
+            self._emulator.step_n(action, self._controllers[1][0], n)
+        elif isinstance(action, tuple) and len(action) == 2:
+            self._emulator.step_n(action[0], action[1], n)
+        else:
+            raise ValueError(f'Invalid action type or length: {type(action)}')
 
+    def frame_advance_many(self, actions: np.ndarray) -> None:
+        """
+        Advance a frame in the emulator for each action in a sequence.
 
+        Args:
+            actions (np.ndarray): the actions to press on the first joy-pad,
+                one byte per frame
 
+        Returns:
+            None
 
+        """
+        actions = np.asarray(actions)
+        if actions.ndim != 1:
+            raise ValueError(f'actions must be 1-D, got shape {actions.shape}')
+        if not actions.size:
+            return
+        # reject values the cast to bytes would wrap or truncate
+        if actions.dtype.kind not in 'ui':
+            raise ValueError(f'actions must be integers, got {actions.dtype}')
+        if actions.min() < 0 or actions.max() > 255:
+            raise ValueError('actions must be in [0, 256)')
+        # run every frame in a single call into the emulator
+        self._emulator.step_many(actions.astype(np.uint8, copy=False))
 
-class StepResult(NamedTuple):
-    observation: np.ndarray
-    reward: float
-    terminated: bool
-    truncated: bool
-    info: Dict[str, Any]
 
 
-@dataclass(init=False)
 class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
     """An NES environment based on the LaiNES emulator."""
     _done: bool    
     _viewer: Optional[ImageViewer]
-    _np_random: np.random.RandomState
+    _np_random: Optional[np.random.Generator]
+    _np_random_seed: Optional[int]
     _snapshot: Optional[np.ndarray]
+    _restored_state: Optional[np.ndarray]
+    _restored_frame: Optional[np.ndarray]
+    _clip_reward: bool
+    _reward_min: float
+    _reward_max: float
+    _has_reward: bool
+    _has_done: bool
+    _has_info: bool
+    _has_did_step: bool
+    _byte_actions: bool
+    _has_load_state: bool
 
     # relevant meta-data about the environment
     metadata: ClassVar[Dict[str, Any]] = {
@@ -191,12 +318,57 @@ class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
     # action space is a bitmap of button press values for the 8 NES buttons
     action_space: ClassVar[Discrete] = Discrete(256)
 
-    def __init__(self, rom_path: str):        
+    # keyboard keys in an array ordered by their byte order in the bitmap
+    # i.e. right = 7, left = 6, ..., B = 1, A = 0
+    _BUTTONS: ClassVar[np.ndarray] = np.array([
+        0x64,  # right  ('d')
+        0x61,  # left   ('a')
+        0x73,  # down   ('s')
+        0x77,  # up     ('w')
+        0x0D,  # start  ('\r')
+        0x20,  # select (' ')
+        0x70,  # B      ('p')
+        0x6F,  # A      ('o')
+    ], dtype=np.int32)
+
+    # the action for each bitmap of pressed buttons, where bit i is set when
+    # the key for bit i of the controller byte, _BUTTONS[7 - i], is pressed.
+    # the controller byte is a button bitmap itself, so this is the identity
+    _KEY_BITS_TO_ACTION: ClassVar[np.ndarray] = np.arange(256, dtype=np.uint8)
+
+    # the mapping of keyboard keys to actions, built on first use
+    _KEYS_TO_ACTION: ClassVar[Optional[Dict[Tuple[int, ...], int]]] = None
+
+    def __init__(self, rom_path: str, render_mode: Optional[str] = None):
+        # check the render mode before allocating the emulator
+        if render_mode is not None and render_mode not in self.metadata['render_modes']:
+            raise ValueError(self._render_mode_error(render_mode))
         super().__init__(rom_path)
 
+        self.render_mode = render_mode
+
         self._viewer = None
         self._done = True
         self._snapshot = None
+        self._restored_state = None
+        self._restored_frame = None
+        # only clip rewards if a subclass narrows the legal reward range
+        self._reward_min, self._reward_max = map(float, self.reward_range)
+        self._clip_reward = math.isfinite(self._reward_min) or math.isfinite(self._reward_max)
+        # skip the callbacks that are left as the default constants
+        self._has_reward = self._overrides('_get_reward')
+        self._has_done = self._overrides('_get_done')
+        self._has_info = self._overrides('_get_info')
+        self._has_did_step = self._overrides('_did_step')
+        # restores can only skip load_state if a subclass doesn't override it
+        self._has_load_state = type(self).load_state is not NESEmulatorWrapper.load_state
+        # with byte actions and the default frame_advance, step can write int
+        # and NumPy integer actions straight to the first joy-pad without the
+        # type dispatch
+        self._byte_actions = (
+            isinstance(self.action_space, Discrete)
+            and type(self).frame_advance is NESEmulatorWrapper.frame_advance
+        )
 
 
     def reset(
@@ -216,8 +388,9 @@ class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
             state (np.ndarray): next frame as a result of the given action
 
         """
-        # Set the seed.
-        super().reset(seed=seed)
+        # seed the RNG directly, as gym.Env.reset would, only if given a seed
+        if seed is not None:
+            self._np_random, self._np_random_seed = seeding.np_random(seed)
 
         # call the before reset callback
         self._will_reset()
@@ -235,7 +408,7 @@ class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
         self._done = False
 
         # return the _screen_buffer from the emulator
-        return self._screen_buffer, self._get_info()
+        return self._screen_view, self._get_info() if self._has_info else {}
 
 
     def step(self, action: int) -> Tuple[np.ndarray, SupportsFloat, bool, bool, Dict[str, Any]]:
@@ -258,29 +431,30 @@ class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
         if self._done:
             raise ValueError('cannot step in a done environment! call `reset`')
         
-        self.frame_advance(action)
+        if self._byte_actions and (type(action) is int or isinstance(action, np.integer)):
+            self._advance_int(action)
+        else:
+            self.frame_advance(action)
 
         # get the reward for this step
-        reward = float(self._get_reward())
-        reward = min(max(reward, self.reward_range[0]), self.reward_range[1])
+        reward = self._get_reward() if self._has_reward else 0.0
+        if type(reward) is not float:
+            reward = float(reward)
+        if self._clip_reward:
+            reward = min(max(reward, self._reward_min), self._reward_max)
 
         # get the done flag for this step
-        self._done = bool(self._get_done())
+        self._done = bool(self._get_done()) if self._has_done else False
 
         # get the info for this step
-        info = self._get_info()
+        info = self._get_info() if self._has_info else {}
 
         # call the after step callback
-        self._did_step(self._done)
+        if self._has_did_step:
+            self._did_step(self._done)
 
         # return the _screen_buffer from the emulator and other relevant data
-        return StepResult(
-            observation=self._screen_buffer,
-            reward=reward,
-            terminated=self._done,
-            truncated=False,
-            info=info
-        )
+        return self._screen_view, reward, self._done, False, info
 
 
     def close(self):
@@ -294,17 +468,23 @@ class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
 
         # deallocate the object locally
         self._emulator = None
+        # drop the views into the deallocated emulator memory
+        self._screen_view = None
+        self._ram_view = None
+        self._controllers = None
+        self._controller0 = None
 
         # if there is an image viewer open, delete it
         if self._viewer is not None:
             self._viewer.close()
 
-    def render(self, mode='human'):
+    def render(self, mode: Optional[str] = None):
         """
         Render the environment.
 
         Args:
-            mode (str): the mode to render with:
+            mode (str): the mode to render with, defaults to the `render_mode`
+            of the environment, or 'human' if it has none:
             - human: render to the current display
             - rgb_array: Return an numpy.ndarray with shape (x, y, 3),
               representing RGB values for an x-by-y pixel image
@@ -313,73 +493,115 @@ class NESEnv(NESEmulatorWrapper, gym.Env[np.ndarray, int]):
             a numpy array if mode is 'rgb_array', None otherwise
 
         """
-        if mode == 'human':
-            # if the viewer isn't setup, import it and create one
-            if self._viewer is None:
-                # get the caption for the ImageViewer
-                if self.spec is None:
-                    # if there is no spec, just use the .nes filename
-                    caption = self._rom_path.split('/')[-1]
-                else:
-                    # set the caption to the OpenAI Gym id
-                    caption = self.spec.id
-                # create the ImageViewer to display frames
-                self._viewer = ImageViewer(
-                    caption=caption,
-                    height=self._emulator.height,
-                    width=self._emulator.width,
-                )
-            # show the _screen_buffer on the image viewer
-            self._viewer.show(self._screen_buffer)
-        elif mode == 'rgb_array':
-            return self._screen_buffer
+        if mode is None:
+            mode = 'human' if self.render_mode is None else self.render_mode
+        if mode == 'rgb_array':
+            return self._render_rgb()
+        elif mode == 'human':
+            self._render_human()
         else:
-            # unpack the modes as comma delineated strings ('a', 'b', ...)
-            render_modes = [repr(x) for x in self.metadata['render.modes']]
-            msg = 'valid render modes are: {}'.format(', '.join(render_modes))
-            raise NotImplementedError(msg)
+            raise NotImplementedError(self._render_mode_error(mode))
+
+    def _render_human(self) -> None:
+        """Show the screen on the image viewer."""
+        # if the viewer isn't setup, import it and create one
+        if self._viewer is None:
+            # get the caption for the ImageViewer
+            if self.spec is None:
+                # if there is no spec, just use the .nes filename
+                caption = self._rom_path.split('/')[-1]
+            else:
+                # set the caption to the OpenAI Gym id
+                caption = self.spec.id
+            # create the ImageViewer to display frames
+            self._viewer = ImageViewer(
+                caption=caption,
+                height=NESEmulator.height,
+                width=NESEmulator.width,
+            )
+        # show the _screen_buffer on the image viewer
+        self._viewer.show(self._screen_view)
+
+    def _render_rgb(self) -> np.ndarray:
+        """Return the screen as an RGB array."""
+        return self._screen_view
+
+    def _render_mode_error(self, mode: Any) -> str:
+        """Return the error message for an unsupported render mode."""
+        # unpack the modes as comma delineated strings ('a', 'b', ...)
+        render_modes = [repr(x) for x in self.metadata['render_modes']]
+        return 'invalid render mode {!r}, valid render modes are: {}'.format(
+            mode, ', '.join(render_modes)
+        )
 
-    def get_keys_to_action(self):
+    def get_keys_to_action(self) -> Dict[Tuple[int, ...], int]:
         """Return the dictionary of keyboard keys to actions."""
-        # keyboard keys in an array ordered by their byte order in the bitmap
-        # i.e. right = 7, left = 6, ..., B = 1, A = 0
-        buttons = np.array([
-            ord('d'),  # right
-            ord('a'),  # left
-            ord('s'),  # down
-            ord('w'),  # up
-            ord('\r'), # start
-            ord(' '),  # select
-            ord('p'),  # B
-            ord('o'),  # A
-        ])
-        # the dictionary of key presses to controller codes
-        keys_to_action = {}
-        # the combination map of values for the controller
-        values = 8 * [[0, 1]]
-        # iterate over all the combinations
-        for combination in itertools.product(*values):
-            # unpack the tuple of bits into an integer
-            byte = int(''.join(map(str, combination)), 2)
-            # unwrap the pressed buttons based on the bitmap
-            pressed = buttons[list(map(bool, combination))]
-            # assign the pressed buttons to the output byte
-            keys_to_action[tuple(sorted(pressed))] = byte
-
+        # the mapping is static, so build it once and share it across calls
+        if NESEnv._KEYS_TO_ACTION is not None:
+            return NESEnv._KEYS_TO_ACTION
+        # unpack the bits of every controller byte, most significant bit first
+        bits = np.unpackbits(np.arange(256, dtype=np.uint8).reshape(-1, 1), axis=1)
+        # look up the action for the bitmap of exactly those buttons
+        actions = NESEnv._KEY_BITS_TO_ACTION[np.packbits(bits, axis=1).ravel()]
+        # the sorted pressed keys of each byte mapped to the byte
+        keys_to_action = {
+            tuple(np.sort(NESEnv._BUTTONS[pressed]).tolist()): action
+            for action, pressed in zip(actions.tolist(), bits.astype(bool))
+        }
+        NESEnv._KEYS_TO_ACTION = keys_to_action
         return keys_to_action
 
+    def key_bits_to_action(self, bits: int) -> int:
+        """
+        Return the action for a bitmap of pressed keyboard keys.
+
+        Args:
+            bits (int): the bitmap of pressed keys, where bit i is set when
+                the key for bit i of the controller byte is pressed
+
+        Returns:
+            the action that presses the buttons of the pressed keys
+
+        """
+        # a negative bitmap would wrap around to the end of the table
+        if not 0 <= bits < 256:
+            raise ValueError(f'key bits must be in [0, 256), got {bits!r}')
+        return int(NESEnv._KEY_BITS_TO_ACTION[bits])
+
     def get_action_meanings(self):
         """Return a list of actions meanings."""
         return ['NOOP']
     
     def _backup(self):
-        self._snapshot = self.dump_state()
+        # overwrite the previous snapshot instead of allocating a new one,
+        # unless a subclass defines its own state format
+        if self._snapshot is None or self._has_dump_state or self._has_load_state:
+            self._snapshot = self.dump_state()
+        else:
+            self._emulator.dump_state_into(self._snapshot)
+        # the restored state is captured on the first restore of the snapshot
+        self._restored_state = None
 
     def _restore(self):
         if self._snapshot is None:
             raise ValueError('no snapshot to restore')
-        
-        self.load_state(self._snapshot)
+
+        if self._has_load_state or self._has_dump_state:
+            self.load_state(self._snapshot)
+            return
+
+        # the same steps as load_state, keeping the loaded state for reuse
+        self._will_restore()
+        if self._restored_state is None:
+            self._emulator.load_state(self._snapshot)
+            # loading runs a PPU frame, so keep its result to copy back on
+            # later restores of the same snapshot
+            self._restored_state = self._emulator.dump_state()
+            self._restored_frame = self._emulator.frame_buffer().copy()
+        else:
+            self._emulator.load_state(self._restored_state, ppu_step=False)
+            np.copyto(self._emulator.frame_buffer(), self._restored_frame)
+        self._did_restore()
 
 
 # explicitly define the outward facing API of this module
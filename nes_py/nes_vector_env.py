@@ -0,0 +1,149 @@
+"""A batch of NES environments stepped in lockstep into shared buffers."""
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+from typing import Callable
+from typing import Optional
+
+import numpy as np
+import gymnasium as gym
+from gymnasium.vector.utils import batch_space
+
+
+class NESVectorEnv(gym.vector.VectorEnv):
+    """
+    A vector of NES environments that share pre-allocated batch buffers.
+
+    The observation, reward, terminated, and truncated arrays are allocated
+    once and overwritten by every call to `reset` and `step`, so copy them
+    before stepping again if they need to be kept. Environments that end an
+    episode are reset on the following call to `step`, which returns their
+    first frame with zero reward.
+
+    """
+
+    def __init__(self, env_fn: Callable[[], gym.Env], num_envs: int):
+        """
+        Initialize a new vector of NES environments.
+
+        Args:
+            env_fn (callable): a function that creates a single NESEnv,
+                which may be wrapped
+            num_envs (int): the number of environments to run
+
+        Returns:
+            None
+
+        """
+        self.envs: List[gym.Env] = [env_fn() for _ in range(num_envs)]
+        if not self.envs:
+            raise ValueError('num_envs must be at least 1.')
+        self.num_envs = num_envs
+        # copy the metadata so changes don't reach the NESEnv class dict
+        self.metadata = dict(self.envs[0].metadata)
+        self.render_mode = None
+
+        # every environment shares the static spaces of the NESEnv class
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        # the batch buffers are reused across every reset and step
+        self._observations = np.zeros(self.observation_space.shape, dtype=np.uint8)
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminations = np.zeros(num_envs, dtype=np.bool_)
+        self._truncations = np.zeros(num_envs, dtype=np.bool_)
+        self._autoreset_envs = np.zeros(num_envs, dtype=np.bool_)
+
+    def reset(
+        self,
+        *,
+        seed: Union[int, List[Optional[int]], None] = None,
+        options: Union[Dict[str, Any], None] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Reset every environment and return the batch of initial frames.
+
+        Args:
+            seed (int | list): an optional seed for the first environment,
+                incremented for each following one, or a list of seeds with
+                one entry per environment
+            options (any): passed to the reset of each environment
+
+        Returns:
+            a tuple of the batch of observations and the batched info
+
+        """
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+        if len(seeds) != self.num_envs:
+            raise ValueError(f'expected {self.num_envs} seeds, got {len(seeds)}')
+
+        infos: Dict[str, Any] = {}
+        for i, (env, env_seed) in enumerate(zip(self.envs, seeds)):
+            obs, info = env.reset(seed=env_seed, options=options)
+            np.copyto(self._observations[i], obs)
+            if info:
+                infos = self._add_info(infos, info, i)
+
+        self._rewards.fill(0.0)
+        self._terminations.fill(False)
+        self._truncations.fill(False)
+        self._autoreset_envs.fill(False)
+
+        return self._observations, infos
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Run one frame of every NES with its action from the batch.
+
+        Args:
+            actions (np.ndarray): one controller byte per environment
+
+        Returns:
+            a tuple of:
+            - states (np.ndarray): the batch of frames after the actions
+            - rewards (np.ndarray): the reward of each environment
+            - terminated (np.ndarray): whether each episode has ended
+            - truncated (np.ndarray): whether each episode has been truncated
+            - info (dict): the batched info of the environments
+
+        """
+        # plain ints skip the NumPy scalar path in each controller write
+        actions = np.asarray(actions).tolist()
+        # check the batch before stepping any of the environments
+        if not isinstance(actions, list) or len(actions) != self.num_envs:
+            raise ValueError(f'expected a batch of {self.num_envs} actions, got {actions!r}')
+
+        infos: Dict[str, Any] = {}
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            if self._autoreset_envs[i]:
+                obs, info = env.reset()
+                self._rewards[i] = 0.0
+                self._terminations[i] = False
+            else:
+                obs, self._rewards[i], self._terminations[i], _, info = env.step(action)
+            np.copyto(self._observations[i], obs)
+            if info:
+                infos = self._add_info(infos, info, i)
+
+        # environments that just ended are reset on the next step
+        np.copyto(self._autoreset_envs, self._terminations)
+
+        return self._observations, self._rewards, self._terminations, self._truncations, infos
+
+    def close_extras(self, **kwargs: Any):
+        """Close every environment in the vector."""
+        for env in self.envs:
+            env.close()
+
+
+# explicitly define the outward facing API of this module
+__all__ = [NESVectorEnv.__name__]
@@ -0,0 +1,32 @@
+"""Test cases for the JoypadSpace wrapper."""
+from unittest import TestCase
+
+from nes_py.nes_env import NESEnv
+from nes_py.wrappers import JoypadSpace
+from rom_file_abs_path import rom_file_abs_path
+
+
+def create_smb1_joypad_instance():
+    """Return a Super Mario Bros. environment with three discrete actions."""
+    env = NESEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+    return JoypadSpace(env, [['NOOP'], ['right', 'A'], ['left']])
+
+
+class ShouldStepWithDiscreteActions(TestCase):
+    def test(self):
+        env = create_smb1_joypad_instance()
+        env.reset()
+        env.step(1)
+        self.assertEqual(0b10000001, env.unwrapped._controllers[0][0])
+        env.step(2)
+        self.assertEqual(0b01000000, env.unwrapped._controllers[0][0])
+        env.close()
+
+
+class ShouldRaiseValueErrorOnOutOfRangeAction(TestCase):
+    def test(self):
+        env = create_smb1_joypad_instance()
+        env.reset()
+        self.assertRaises(ValueError, env.step, -1)
+        self.assertRaises(ValueError, env.step, 3)
+        env.close()
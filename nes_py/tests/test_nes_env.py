@@ -134,3 +134,384 @@ class ShouldStepEnvBackupRestore(TestCase):
         env._restore()
         self.assertTrue(np.array_equal(backup, env._screen_buffer))
         env.close()
+
+
+class ShouldReturnKeysToAction(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        keys_to_action = env.get_keys_to_action()
+        self.assertEqual(256, len(keys_to_action))
+        self.assertEqual(0, keys_to_action[()])
+        self.assertEqual(0b10000001, keys_to_action[(ord('d'), ord('o'))])
+        self.assertEqual(255, keys_to_action[tuple(sorted(map(ord, 'dasw\r po')))])
+        # the mapping is static and should be shared between calls
+        self.assertIs(keys_to_action, env.get_keys_to_action())
+        env.close()
+
+
+class ShouldClipRewardToNarrowedRange(TestCase):
+    def test(self):
+        class ClippedEnv(NESEnv):
+            reward_range = (-1.0, 1.0)
+
+            def _get_reward(self):
+                return 5
+
+        env = ClippedEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env.reset()
+        _, reward, _, _, _ = env.step(0)
+        self.assertEqual(1.0, reward)
+        env.close()
+
+
+class ShouldAdvanceManyFramesLikeSingleFrames(TestCase):
+    def test(self):
+        actions = np.random.RandomState(0).randint(0, 256, 600).astype(np.uint8)
+        single = create_smb1_instance()
+        single.reset()
+        for action in actions:
+            single.frame_advance(int(action))
+        many = create_smb1_instance()
+        many.reset()
+        many.frame_advance_many(actions)
+        self.assertTrue(np.array_equal(single.ram, many.ram))
+        self.assertTrue(np.array_equal(single.screen, many.screen))
+        single.close()
+        many.close()
+
+
+class ShouldRaiseValueErrorOnInvalidManyActions(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset()
+        ram = env.ram.copy()
+        self.assertRaises(ValueError, env.frame_advance_many, np.array([300, -1]))
+        self.assertRaises(ValueError, env.frame_advance_many, np.array([256]))
+        self.assertRaises(ValueError, env.frame_advance_many, np.array([3.7]))
+        self.assertRaises(ValueError, env.frame_advance_many, np.zeros((2, 2), np.uint8))
+        self.assertTrue(np.array_equal(ram, env.ram))
+        env.frame_advance_many([0, 255])
+        env.frame_advance_many([])
+        env.close()
+
+
+class ShouldKeepBuffersValidAfterClose(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset()
+        for _ in range(60):
+            env.step(0)
+        screen, ram = env.screen, env.ram
+        expected_screen, expected_ram = screen.copy(), ram.copy()
+        env.close()
+        # the views keep the emulator memory alive after the env drops it
+        self.assertTrue(np.array_equal(expected_screen, screen))
+        self.assertTrue(np.array_equal(expected_ram, ram))
+
+
+class ShouldRestoreCompressedState(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset()
+        for _ in range(250):
+            env.step(0)
+        snapshot = env.dump_state_compressed()
+        self.assertLess(len(snapshot), env.state_size)
+        screen = env.screen.copy()
+        for _ in range(250):
+            env.step(8)
+        self.assertFalse(np.array_equal(screen, env.screen))
+        env.load_state_compressed(snapshot)
+        self.assertTrue(np.array_equal(screen, env.screen))
+        env.close()
+
+
+class ShouldCallOverriddenStepCallbacks(TestCase):
+    def test(self):
+        class CallbackEnv(NESEnv):
+            def _get_done(self):
+                return True
+
+            def _get_info(self):
+                return {'calls': len(self.done_flags)}
+
+            def _did_step(self, done):
+                self.done_flags.append(done)
+
+        env = CallbackEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env.done_flags = []
+        env.reset()
+        _, _, terminated, _, info = env.step(0)
+        self.assertTrue(terminated)
+        self.assertEqual({'calls': 0}, info)
+        self.assertEqual([True], env.done_flags)
+        env.close()
+
+
+class ShouldAdvanceNFramesLikeSingleFrames(TestCase):
+    def test(self):
+        path = rom_file_abs_path('super-mario-bros-1.nes')
+        env1 = NESEnv(path)
+        env2 = NESEnv(path)
+        env1.reset()
+        env2.reset()
+        for action in (0, 8, 128, (1, 2)):
+            env1.frame_advance_n(action, 4)
+            for _ in range(4):
+                env2.frame_advance(action)
+            self.assertTrue(np.array_equal(env1.screen, env2.screen))
+            self.assertTrue(np.array_equal(env1.ram, env2.ram))
+        self.assertRaises(ValueError, env1.frame_advance_n, [0], 4)
+        env1.close()
+        env2.close()
+
+
+class ShouldRestoreSnapshotRepeatedly(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset()
+        for _ in range(250):
+            env.step(0)
+        env._backup()
+        snapshot = env.dump_state()
+        results = []
+        for _ in range(3):
+            for action in range(0, 256, 8):
+                env.step(action)
+            env._restore()
+            for _ in range(60):
+                env.step(128)
+            results.append((env.ram.copy(), env.screen.copy()))
+        # compare against loading the snapshot directly
+        env.load_state(snapshot)
+        for _ in range(60):
+            env.step(128)
+        for ram, screen in results:
+            self.assertTrue(np.array_equal(env.ram, ram))
+            self.assertTrue(np.array_equal(env.screen, screen))
+        env.close()
+
+
+class ShouldRenderWithRenderMode(TestCase):
+    def test(self):
+        path = rom_file_abs_path('super-mario-bros-1.nes')
+        env = NESEnv(path, render_mode='rgb_array')
+        self.assertEqual('rgb_array', env.render_mode)
+        state, _ = env.reset()
+        self.assertIs(state, env.render())
+        self.assertIs(state, env.render('rgb_array'))
+        env.close()
+        env = NESEnv(path)
+        self.assertRaises(NotImplementedError, env.render, 'ansi')
+        env.close()
+        self.assertRaises(ValueError, NESEnv, path, render_mode='ansi')
+
+
+class ShouldKeepRenderOverrideWithRenderMode(TestCase):
+    def test(self):
+        class RenderEnv(NESEnv):
+            def render(self, mode=None):
+                return 'overridden'
+
+        env = RenderEnv(rom_file_abs_path('super-mario-bros-1.nes'), render_mode='rgb_array')
+        self.assertEqual('overridden', env.render())
+        self.assertNotIn('render', vars(env))
+        env.close()
+
+
+class ShouldHashAndCompareByIdentity(TestCase):
+    def test(self):
+        env1 = create_smb1_instance()
+        env2 = create_smb1_instance()
+        self.assertEqual(2, len({env1, env2}))
+        self.assertEqual(env1, env1)
+        self.assertNotEqual(env1, env2)
+        env1.close()
+        env2.close()
+
+
+class ShouldCheckChangedROMFilesAgain(TestCase):
+    def test(self):
+        import os
+        import shutil
+        import tempfile
+        from nes_py import nes_env
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.nes')
+            shutil.copy(rom_file_abs_path('super-mario-bros-1.nes'), path)
+            NESEnv(path).close()
+            self.assertTrue(any(key[0] == path for key in nes_env._COMPATIBLE_ROMS))
+            # replace the compatible ROM with an incompatible one
+            shutil.copy(rom_file_abs_path('empty.nes'), path)
+            self.assertRaises(ValueError, NESEnv, path)
+
+
+class ShouldMapKeyBitsToActions(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        keys_to_action = env.get_keys_to_action()
+        for bits in range(256):
+            # the keys for the buttons of the set bits
+            keys = [int(env._BUTTONS[7 - i]) for i in range(8) if bits >> i & 1]
+            action = env.key_bits_to_action(bits)
+            self.assertEqual(keys_to_action[tuple(sorted(keys))], action)
+        self.assertEqual(0b10000001, env.key_bits_to_action(0b10000001))
+        self.assertRaises(ValueError, env.key_bits_to_action, -1)
+        self.assertRaises(ValueError, env.key_bits_to_action, 256)
+        env.close()
+
+
+class ShouldReturnNewInfoDictsForWrappersToUpdate(TestCase):
+    def test(self):
+        class DoneEnv(NESEnv):
+            def _get_done(self):
+                return True
+
+        env = DoneEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env = gym.wrappers.RecordEpisodeStatistics(env)
+        for _ in range(2):
+            _, info = env.reset()
+            self.assertEqual({}, info)
+            _, _, terminated, _, info = env.step(0)
+            self.assertTrue(terminated)
+            self.assertIn('episode', info)
+        env.close()
+
+
+class ShouldSeedRandomNumberGeneratorOnReset(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset(seed=1)
+        self.assertEqual(1, env.np_random_seed)
+        expected = env.np_random.integers(256, size=8)
+        generator = env.np_random
+        env.reset()
+        self.assertIs(generator, env.np_random)
+        env.reset(seed=1)
+        self.assertTrue(np.array_equal(expected, env.np_random.integers(256, size=8)))
+        env.close()
+
+
+class ShouldLoadStateIntoAnotherEnv(TestCase):
+    def test(self):
+        source = create_smb1_instance()
+        target = create_smb1_instance()
+        reference = create_smb1_instance()
+        for env in (source, target, reference):
+            env.reset()
+        for _ in range(200):
+            source.step(128)
+            reference.step(128)
+        target.load_state_compressed(source.dump_state_compressed())
+        reference.load_state(reference.dump_state())
+        # the loaded state must not use the emulator that dumped it
+        source.close()
+        for _ in range(100):
+            target.step(129)
+            reference.step(129)
+        self.assertTrue(np.array_equal(reference.ram, target.ram))
+        self.assertTrue(np.array_equal(reference.screen, target.screen))
+        target.close()
+        reference.close()
+
+
+class ShouldStepWithTupleActions(TestCase):
+    def test(self):
+        class TwoPlayerEnv(NESEnv):
+            action_space = gym.spaces.Tuple((gym.spaces.Discrete(256),) * 2)
+
+        env = TwoPlayerEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env.reset()
+        env.step((8, 4))
+        self.assertEqual(8, env._controllers[0][0])
+        self.assertEqual(4, env._controllers[1][0])
+        env.step(np.int64(1))
+        self.assertEqual(1, env._controllers[0][0])
+        self.assertRaises(ValueError, env.step, 3.7)
+        env.close()
+
+
+class ShouldStepNumPyIntegerActionsWithoutDispatch(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset()
+        calls = []
+        env.frame_advance = calls.append
+        for action in (np.uint8(129), np.int64(128), 1):
+            env.step(action)
+            self.assertEqual(action, env._controllers[0][0])
+        self.assertEqual([], calls)
+        env.close()
+
+
+class ShouldRaiseValueErrorOnFloatAction(TestCase):
+    def test(self):
+        env = create_smb1_instance()
+        env.reset()
+        self.assertRaises(ValueError, env.step, 3.7)
+        env.close()
+
+
+class ShouldRestoreThroughOverriddenLoadState(TestCase):
+    def test(self):
+        class LoadStateEnv(NESEnv):
+            def load_state(self, snapshot):
+                self.loads += 1
+                super().load_state(snapshot)
+
+        env = LoadStateEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env.loads = 0
+        env.reset()
+        env._backup()
+        for _ in range(3):
+            env.reset()
+        self.assertEqual(3, env.loads)
+        env.close()
+
+
+class ShouldRestoreThroughOverriddenDumpState(TestCase):
+    def test(self):
+        class TaggedStateEnv(NESEnv):
+            def dump_state(self):
+                return np.concatenate([super().dump_state(), np.full(4, 7, np.uint8)])
+
+            def load_state(self, snapshot):
+                assert np.array_equal(snapshot[-4:], np.full(4, 7, np.uint8))
+                super().load_state(snapshot[:-4])
+
+        env = TaggedStateEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env.reset()
+        for _ in range(100):
+            env.step(128)
+        # backing up twice reuses the snapshot of the base implementation
+        env._backup()
+        env._backup()
+        ram = env.ram.copy()
+        for _ in range(100):
+            env.step(129)
+        env.reset()
+        self.assertTrue(np.array_equal(ram, env.ram))
+        env.close()
+
+
+class ShouldCompressThroughOverriddenDumpState(TestCase):
+    def test(self):
+        class TaggedStateEnv(NESEnv):
+            def dump_state(self):
+                return np.concatenate([super().dump_state(), np.full(4, 7, np.uint8)])
+
+            def load_state(self, snapshot):
+                assert np.array_equal(snapshot[-4:], np.full(4, 7, np.uint8))
+                super().load_state(snapshot[:-4])
+
+        env = TaggedStateEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+        env.reset()
+        for _ in range(100):
+            env.step(128)
+        snapshot = env.dump_state_compressed()
+        ram = env.ram.copy()
+        for _ in range(100):
+            env.step(129)
+        env.load_state_compressed(snapshot)
+        self.assertTrue(np.array_equal(ram, env.ram))
+        env.close()
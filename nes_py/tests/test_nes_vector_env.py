@@ -0,0 +1,99 @@
+"""Test cases for the NESVectorEnv class."""
+from unittest import TestCase
+
+import numpy as np
+
+from nes_py.nes_env import NESEnv
+from nes_py.nes_vector_env import NESVectorEnv
+from nes_py.wrappers import JoypadSpace
+from rom_file_abs_path import rom_file_abs_path
+
+
+def make_env():
+    """Return a new Super Mario Bros. environment."""
+    return NESEnv(rom_file_abs_path('super-mario-bros-1.nes'))
+
+
+def make_joypad_env():
+    """Return a Super Mario Bros. environment with three discrete actions."""
+    return JoypadSpace(make_env(), [['NOOP'], ['right', 'A'], ['left']])
+
+
+class ShouldRaiseValueErrorOnZeroEnvs(TestCase):
+    def test(self):
+        self.assertRaises(ValueError, NESVectorEnv, make_env, 0)
+
+
+class ShouldStepLikeSingleEnvs(TestCase):
+    def test(self):
+        vector_env = NESVectorEnv(make_env, 3)
+        env = make_env()
+        obs, info = vector_env.reset()
+        expected, _ = env.reset()
+        self.assertEqual((3, *NESEnv.observation_space.shape), obs.shape)
+        self.assertEqual({}, info)
+        for i in range(3):
+            self.assertTrue(np.array_equal(expected, obs[i]))
+        for action in range(0, 256, 16):
+            obs, reward, terminated, truncated, _ = vector_env.step(np.full(3, action))
+            expected, *_ = env.step(action)
+            self.assertTrue(np.array_equal(expected, obs[1]))
+        self.assertEqual((3,), reward.shape)
+        self.assertFalse(terminated.any())
+        self.assertFalse(truncated.any())
+        vector_env.close()
+        env.close()
+
+
+class ShouldStepWrappedEnvs(TestCase):
+    def test(self):
+        vector_env = NESVectorEnv(make_joypad_env, 2)
+        env = make_joypad_env()
+        obs, _ = vector_env.reset()
+        expected, _ = env.reset()
+        self.assertTrue(np.array_equal(expected, obs[0]))
+        for action in [0, 1, 2, 1]:
+            obs, *_ = vector_env.step(np.full(2, action))
+            expected, *_ = env.step(action)
+            self.assertTrue(np.array_equal(expected, obs[1]))
+        vector_env.close()
+        env.close()
+
+
+class ShouldResetEnvsAfterTermination(TestCase):
+    def test(self):
+        class DoneEnv(NESEnv):
+            def _get_reward(self):
+                return 1.0
+
+            def _get_done(self):
+                return True
+
+        vector_env = NESVectorEnv(
+            lambda: DoneEnv(rom_file_abs_path('super-mario-bros-1.nes')), 2
+        )
+        vector_env.reset()
+        _, reward, terminated, _, _ = vector_env.step(np.zeros(2, dtype=np.uint8))
+        self.assertTrue(terminated.all())
+        self.assertEqual([1.0, 1.0], reward.tolist())
+        obs, reward, terminated, _, _ = vector_env.step(np.zeros(2, dtype=np.uint8))
+        self.assertFalse(terminated.any())
+        self.assertEqual([0.0, 0.0], reward.tolist())
+        for i, env in enumerate(vector_env.envs):
+            self.assertTrue(np.array_equal(env.screen, obs[i]))
+        vector_env.close()
+        self.assertTrue(vector_env.closed)
+
+
+class ShouldRaiseValueErrorOnWrongActionBatchSize(TestCase):
+    def test(self):
+        vector_env = NESVectorEnv(make_env, 2)
+        vector_env.reset()
+        for actions in (np.full(1, 5), np.full(3, 5), 5):
+            self.assertRaises(ValueError, vector_env.step, actions)
+        # no environment steps when the batch is rejected
+        for env in vector_env.envs:
+            self.assertNotEqual(5, env._controllers[0][0])
+        vector_env.metadata['render_fps'] = 30
+        self.assertEqual(60, NESEnv.metadata['render_fps'])
+        vector_env.close()
@@ -51,8 +51,9 @@ class JoypadSpace(Wrapper[WrapperObsType, WrapperActType, ObsType, ActType]):
         super().__init__(env)
         # create the new action space
         self.action_space = gym.spaces.Discrete(len(actions))
-        # create the action map from the list of discrete actions
-        self._action_map = {}
+        # create the action map from the list of discrete actions, as a
+        # tuple indexed by the discrete action for a fast lookup in step
+        action_map = []
         self._action_meanings = {}
         # iterate over all the actions (as button lists)
         for action, button_list in enumerate(actions):
@@ -62,8 +63,9 @@ class JoypadSpace(Wrapper[WrapperObsType, WrapperActType, ObsType, ActType]):
             for button in button_list:
                 byte_action |= self._button_map[button]
             # set this action maps value to the byte action value
-            self._action_map[action] = byte_action
+            action_map.append(byte_action)
             self._action_meanings[action] = ' '.join(button_list)
+        self._action_map = tuple(action_map)
 
     def step(
         self, 
@@ -83,6 +85,9 @@ class JoypadSpace(Wrapper[WrapperObsType, WrapperActType, ObsType, ActType]):
             - (dict) a dictionary of extra information
 
         """
+        # a negative index would silently pick an action from the end
+        if not 0 <= action < len(self._action_map):
+            raise ValueError(f'invalid action {action!r} for {self.action_space}')
         # take the step and record the output
         return self.env.step(self._action_map[action])
 
@@ -104,7 +109,7 @@ class JoypadSpace(Wrapper[WrapperObsType, WrapperActType, ObsType, ActType]):
         # create a new mapping of keys to actions
         keys_to_action = {}
         # iterate over the actions and their byte values in this mapper
-        for action, byte in self._action_map.items():
+        for action, byte in enumerate(self._action_map):
             # get the keys to press for the action
             keys = action_to_keys[byte]
             # set the keys value in the dictionary to the current discrete act
@@ -1,41 +1,14 @@
 """The setup script for installing and distributing the nes-py package."""
 import os
-import subprocess
 from glob import glob
 from typing import List
-from pathlib import Path
 
 import pybind11
 from setuptools import find_packages
 from setuptools import setup
-from setuptools.command.build_ext import build_ext
+from pybind11.setup_helpers import ParallelCompile
 from pybind11.setup_helpers import Pybind11Extension
-
-
-class MakeBuilder(build_ext):
-    """Custom builder that uses Make."""
-    
-    def build_extension(self, ext: Pybind11Extension) -> None:
-        """Build the extension using Make."""
-        extension_path: str = os.path.dirname(ext.sources[0])
-        make_path: str = os.path.join(extension_path, '..')
-        
-        try:
-            n_jobs = min(16, os.cpu_count())
-            subprocess.check_call(['make', '-C', make_path, f'-j{n_jobs}'])
-            
-            built_lib: str = os.path.join(make_path, 'libemulator.so')
-            target_lib: str = self.get_ext_fullpath(ext.name)
-            
-            if os.path.exists(built_lib):
-                os.makedirs(os.path.dirname(target_lib), exist_ok=True)
-                import shutil
-                shutil.copy2(built_lib, target_lib)
-            else:
-                raise RuntimeError(f'Built library not found at {built_lib}')
-                
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f'Error building extension: {e}')
+from pybind11.setup_helpers import build_ext
 
 
 def read_readme() -> str:
@@ -55,6 +28,26 @@ def configure_compiler() -> None:
     os.environ['CCX'] = 'g++'
 
 
+def is_native_build() -> bool:
+    """Return True if the build should optimize for the host CPU."""
+    # host specific code doesn't run on other CPUs, so keep wheels portable
+    return os.environ.get('NES_PY_NATIVE') == '1'
+
+
+def get_compile_args() -> List[str]:
+    """Get the C++ compiler flags, optimizing for the host if requested."""
+    args: List[str] = ['-O3', '-Wall', '-Wextra', '-pedantic']
+    if is_native_build():
+        args += [
+            '-march=native',
+            '-mtune=native',
+            '-flto',
+            '-fno-semantic-interposition',
+            '-funroll-loops',
+        ]
+    return args
+
+
 def get_extension_modules() -> List[Pybind11Extension]:
     """Create and return the extension modules configuration."""
     sources: List[str] = get_source_files()
@@ -69,8 +62,9 @@ def get_extension_modules() -> List[Pybind11Extension]:
                 pybind11.get_include(),
                 pybind11.get_include(user=True)
             ],
-            cxx_std=14,
-            extra_compile_args=['-O3', '-Wall', '-Wextra', '-pedantic'],
+            cxx_std=17,
+            extra_compile_args=get_compile_args(),
+            extra_link_args=['-flto'] if is_native_build() else [],
         ),
     ]
 
@@ -84,7 +78,9 @@ def get_requirements() -> List[str]:
 def main() -> None:
     """Main setup configuration."""
     configure_compiler()
-    
+    # compile the sources in parallel, NPY_NUM_BUILD_JOBS sets the job count
+    ParallelCompile('NPY_NUM_BUILD_JOBS').install()
+
     setup(
         name='nes_py',
         version='9.1.4',
@@ -130,7 +126,7 @@ def main() -> None:
             ],
         },
         python_requires='>=3.8',
-        cmdclass={'build_ext': MakeBuilder},
+        cmdclass={'build_ext': build_ext},
     )
 
 